@@ -29,31 +29,57 @@ fi
 SIGNATURE_PATH="$TARGET_PATH.sig"
 TMP_HASH="$(mktemp)"
 TMP_DER="$(mktemp)"
-trap 'rm -f "$TMP_HASH" "$TMP_DER"' EXIT
+TMP_KEY="$(mktemp)"
+trap 'rm -f "$TMP_HASH" "$TMP_DER" "$TMP_KEY"' EXIT
+
+# Load (and, if protected, decrypt) the private key exactly once; the curve
+# check and the signing step below both read the private temporary copy.
+openssl pkey -in "$PRIVATE_KEY_PATH" -out "$TMP_KEY"
+
+# The OTA verifier only accepts ECDSA P-256 (algorithm id 1); reject other
+# key types and curves instead of producing a blob every device will refuse.
+if ! openssl pkey -in "$TMP_KEY" -noout -text_pub | grep -q 'ASN1 OID: prime256v1'; then
+  echo "Private key is not an ECDSA P-256 key: $PRIVATE_KEY_PATH" >&2
+  exit 1
+fi
 
 openssl dgst -sha256 -binary -out "$TMP_HASH" "$TARGET_PATH"
-openssl dgst -sha256 -sign "$PRIVATE_KEY_PATH" -out "$TMP_DER" "$TARGET_PATH"
+# Sign the digest computed above instead of letting openssl re-hash the
+# whole image; the device verifies against the same SHA-256 digest.
+# Use deterministic ECDSA (RFC 6979) when OpenSSL >= 3.2 supports it, so
+# re-signing an unchanged image yields an identical main.bin.sig.
+set -- -pkeyopt digest:sha256
+if openssl version | awk '$1 == "OpenSSL" { split($2, v, "."); exit !(v[1] > 3 || (v[1] == 3 && v[2] >= 2)) } { exit 1 }'; then
+  set -- "$@" -pkeyopt nonce-type:1
+fi
+openssl pkeyutl -sign -inkey "$TMP_KEY" "$@" \
+  -in "$TMP_HASH" -out "$TMP_DER"
 
 python3 - "$TARGET_PATH" "$TMP_HASH" "$TMP_DER" "$SIGNATURE_PATH" <<'PY'
 import os
 import struct
 import sys
+from pathlib import Path
 
 firmware_path, hash_path, sig_der_path, output_path = sys.argv[1:5]
 firmware_len = os.path.getsize(firmware_path)
-firmware_hash = open(hash_path, 'rb').read()
-signature_der = open(sig_der_path, 'rb').read()
+firmware_hash = Path(hash_path).read_bytes()
+signature_der = Path(sig_der_path).read_bytes()
 
 MAGIC = 0x4C434D53  # LCMS
 VERSION = 1
 ALGORITHM = 1  # ECDSA P-256 SHA-256
 RESERVED = 0
+MAX_SIGNATURE_LEN = 72  # DER-encoded ECDSA P-256 (r, s)
+
+if len(firmware_hash) != 32:
+    sys.exit(f"Unexpected SHA-256 digest length: {len(firmware_hash)}")
+if not 0 < len(signature_der) <= MAX_SIGNATURE_LEN:
+    sys.exit(f"Unexpected ECDSA P-256 signature length: {len(signature_der)}")
 
 header = struct.pack('<IBBHI32sH', MAGIC, VERSION, ALGORITHM, RESERVED,
                      firmware_len, firmware_hash, len(signature_der))
-with open(output_path, 'wb') as f:
-    f.write(header)
-    f.write(signature_der)
+Path(output_path).write_bytes(header + signature_der)
 
 print(f"Wrote {output_path} ({len(header) + len(signature_der)} bytes)")
 PY
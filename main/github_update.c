@@ -866,12 +866,13 @@ static esp_err_t verify_signature_blob(const uint8_t *sig_blob, size_t sig_len,
     }
 
     const uint8_t *signature = sig_blob + sizeof(ota_sig_header_t);
+    const char *public_key_pem = ota_public_key_pem();
     mbedtls_pk_context pk;
     mbedtls_pk_init(&pk);
 
     int parse_res = mbedtls_pk_parse_public_key(&pk,
-            (const unsigned char *)ota_public_key_pem(),
-            strlen(ota_public_key_pem()) + 1);
+            (const unsigned char *)public_key_pem,
+            strlen(public_key_pem) + 1);
     if (parse_res != 0) {
         ESP_LOGE(TAG, "Public key parse failed: -0x%04x", -parse_res);
         mbedtls_pk_free(&pk);